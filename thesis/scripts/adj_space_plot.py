@@ -5,145 +5,99 @@ It normalizes the space usage of the different graph representations to the CSR
 
 '''
 
+import matplotlib
+matplotlib.use('pdf') # Non-interactive backend: plots are only written to PDF files
 import matplotlib.pyplot as plt
 import numpy as np
-import copy # Used for deep copying data
-from config import setup_matplotlib_fonts, TECHNIQUE_COLORS, OUR_DATA_KEY, CSR_BASELINE_KEY, LOGGRAPH_KEY, CGRAPHINDEX_KEY, to_MB, format_annotation_with_ratio
-from data import SPACE_DATA
+from config import setup_matplotlib_fonts, TECHNIQUE_COLORS, OUR_DATA_KEY, CSR_BASELINE_KEY, LOGGRAPH_KEY, CGRAPHINDEX_KEY, to_MB
+from data import SPACE_DATA, DATASETS, to_matrix, normalize_rows
+from plot_utils import draw_grouped_bars
 
 # Setup fonts
 setup_matplotlib_fonts()
 
-def plot_normalized_with_annotation(data_to_plot, datasets_list, include_our_data=False):
+def plot_normalized_with_annotation(data_to_plot, datasets_list, variants=(False, True), output_filenames=None):
     """
-    Generates and saves a bar plot of graph storage sizes, normalized relative to CSR.
+    Generates and saves bar plots of graph storage sizes, normalized relative to CSR.
+
+    The sizes are normalized and annotated once; each variant then plots its subset of formats.
 
     Args:
         data_to_plot (dict): The dataset dictionary.
         datasets_list (list): List of dataset names (keys in data_to_plot).
-        include_our_data (bool): If True, includes the 'Our' data series in the plot.
+        variants (sequence of bool): One plot per entry; True includes the 'Our' data series.
+        output_filenames (dict, optional): Output PDF path per variant. Defaults to
+            graph_size_normalized_annotated_with_our.pdf / _without_our.pdf.
     """
-    current_data = copy.deepcopy(data_to_plot) # Use a copy to avoid modifying original data
-
     base_formats = [CSR_BASELINE_KEY, LOGGRAPH_KEY, CGRAPHINDEX_KEY]
-    base_format_colors = {
+    all_formats = base_formats + [OUR_DATA_KEY]
+    format_colors = {
         CSR_BASELINE_KEY: TECHNIQUE_COLORS['CSR'],
         LOGGRAPH_KEY: TECHNIQUE_COLORS['LogGraph'],
-        CGRAPHINDEX_KEY: TECHNIQUE_COLORS['CGraphIndex']
+        CGRAPHINDEX_KEY: TECHNIQUE_COLORS['CGraphIndex'],
+        OUR_DATA_KEY: TECHNIQUE_COLORS['Our'] # Red color for 'Our' (standardized)
     }
+    title_suffix = ""
 
-    if include_our_data:
-        current_formats = base_formats + [OUR_DATA_KEY]
-        current_format_colors = {**base_format_colors, OUR_DATA_KEY: TECHNIQUE_COLORS['Our']} # Red color for 'Our' (standardized)
-        file_suffix = "_with_our"
-        title_suffix = ""
-    else:
-        current_formats = base_formats
-        current_format_colors = base_format_colors
-        # Remove OUR_DATA_KEY from data if it exists and we are not including it
-        for ds_values in current_data.values():
-            ds_values.pop(OUR_DATA_KEY, None)
-        file_suffix = "_without_our"
-        title_suffix = ""
-
-
-    normalized_sizes = []
-    absolute_sizes_MB = []
-
+    plotted_datasets = []
     for ds_name in datasets_list:
-        if CSR_BASELINE_KEY not in current_data[ds_name]:
+        if CSR_BASELINE_KEY not in data_to_plot[ds_name]:
             print(f"Warning: {CSR_BASELINE_KEY} data missing for dataset {ds_name}. Skipping.")
             continue
+        plotted_datasets.append(ds_name)
 
-        csr_size = current_data[ds_name][CSR_BASELINE_KEY]
-        temp_normalized = []
-        temp_absolute_MB = []
-
-        for fmt in current_formats:
-            if fmt in current_data[ds_name]:
-                size = current_data[ds_name][fmt]
-                temp_normalized.append(size / csr_size)
-                temp_absolute_MB.append(to_MB(size))
-            else:
-                # Handle cases where a format might be missing for a dataset (e.g. 'Our' if include_our_data is False)
-                # This shouldn't happen with the current logic for 'Our', but good for robustness
-                temp_normalized.append(0) # Or np.nan, depending on how you want to handle
-                temp_absolute_MB.append(0) # Or np.nan
-
-        normalized_sizes.append(temp_normalized)
-        absolute_sizes_MB.append(temp_absolute_MB)
-
-    if not normalized_sizes: # If no data was processed
+    if not plotted_datasets: # If no data was processed
         print("No data to plot.")
         return
 
-    normalized_sizes_np = np.array(normalized_sizes)
-    absolute_sizes_MB_np = np.array(absolute_sizes_MB)
-
-    x = np.arange(len(datasets_list))
-    num_formats = len(current_formats)
-    total_width_for_bars = 0.8 # Total width allocated for all bars for a single dataset
-    width_per_bar = total_width_for_bars / num_formats
-
-    # Adjust starting position for centering bars
-    start_offset = - (total_width_for_bars - width_per_bar) / 2
-
-
-    fig, ax = plt.subplots(figsize=(12, 7)) # Adjusted figure size for potentially more bars
-
-    for i, fmt in enumerate(current_formats):
-        # positions = x + (i - (num_formats -1) / 2) * width_per_bar # Centering logic
-        positions = x + start_offset + i * width_per_bar
-        bars = ax.bar(positions, normalized_sizes_np[:, i], width=width_per_bar, label=fmt, color=current_format_colors.get(fmt, '#808080'))
-
-        for bar_idx, bar in enumerate(bars):
-            # Ensure we don't try to access out of bounds if a format was missing
-            if bar_idx < absolute_sizes_MB_np.shape[0] and i < absolute_sizes_MB_np.shape[1]:
-                size_mb = absolute_sizes_MB_np[bar_idx, i]
-                height = bar.get_height()
-                if size_mb > 0: # Only annotate if there's actual data
-                    # Show both absolute size and normalization ratio
-                    annotation_text = format_annotation_with_ratio(size_mb, height, "MB")
-                    
-                    ax.text(
-                        bar.get_x() + bar.get_width() / 2,
-                        height + 0.03,
-                        annotation_text,
-                        ha='center',
-                        va='bottom',
-                        fontsize=8,
-                        rotation=90
-                    )
-
-    ax.axhline(y=1.0, color='gray', linestyle='--', linewidth=1.2, label=f'{CSR_BASELINE_KEY} baseline')
-    ax.set_xlabel('Dataset')
-    ax.set_ylabel(f'Relative Size ({CSR_BASELINE_KEY} = 1.0)')
-    ax.set_title(f'Graph Storage Relative to {CSR_BASELINE_KEY}{title_suffix}')
-    ax.set_xticks(x)
-    ax.set_xticklabels(datasets_list)
-
-    # Adjust y-limit to ensure annotations are visible
-    max_normalized_val = np.nanmax(normalized_sizes_np) if normalized_sizes_np.size > 0 else 1
-    ax.set_ylim(0, max_normalized_val * 1.5) # Increased multiplier for more space
-
-    # Place legend outside and below the graph, expanding horizontally
-    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.1), ncol=len(current_formats) + 1, 
-              frameon=True, fancybox=True, shadow=False, fontsize=13)
-    plt.tight_layout()
-    plt.subplots_adjust(bottom=0.2)  # Make room for the legend below
-
-    # --- Export ---
-    base_filename = "graph_size_normalized_annotated"
-    plt.savefig(f"{base_filename}{file_suffix}.pdf", bbox_inches='tight')
-    print(f"Saved plot: {base_filename}{file_suffix}.pdf")
-    plt.show()
+    # Rows are datasets, columns are formats; a missing format gets size 0 and is left unannotated
+    sizes = to_matrix(data_to_plot, all_formats, plotted_datasets)
+    csr_col = all_formats.index(CSR_BASELINE_KEY)
+    normalized_sizes_np = normalize_rows(sizes, sizes[:, csr_col:csr_col + 1])
+    absolute_sizes_MB_np = to_MB(sizes)
+
+    # Ratio labels in the format of format_annotation_with_ratio, blank for the baseline and missing formats
+    labels = np.where(normalized_sizes_np != 1.0, np.char.mod('%.1fx', normalized_sizes_np), '')
+    labels = np.where(absolute_sizes_MB_np > 0, labels, '')
+
+    for include_our_data in variants:
+        # Without 'Our', only the leading base format columns are plotted
+        n_formats = len(all_formats) if include_our_data else len(base_formats)
+        current_formats = all_formats[:n_formats]
+        current_normalized = normalized_sizes_np[:, :n_formats]
+
+        fig, ax = plt.subplots(figsize=(12, 7)) # Adjusted figure size for potentially more bars
+
+        current_colors = [format_colors.get(fmt, '#808080') for fmt in current_formats]
+        format_handles = draw_grouped_bars(ax, current_normalized, plotted_datasets, current_formats,
+                                           current_colors, labels=labels[:, :n_formats], fontsize=8)
+
+        baseline = ax.axhline(y=1.0, color='gray', linestyle='--', linewidth=1.2, label=f'{CSR_BASELINE_KEY} baseline')
+        ax.set_xlabel('Dataset')
+        ax.set_ylabel(f'Relative Size ({CSR_BASELINE_KEY} = 1.0)')
+        ax.set_title(f'Graph Storage Relative to {CSR_BASELINE_KEY}{title_suffix}')
+
+        # Adjust y-limit to ensure annotations are visible
+        max_normalized_val = np.nanmax(current_normalized) if current_normalized.size > 0 else 1
+        ax.set_ylim(0, max_normalized_val * 1.5) # Increased multiplier for more space
+
+        # Place legend outside and below the graph, expanding horizontally
+        ax.legend(handles=[baseline] + format_handles, loc='upper center', bbox_to_anchor=(0.5, -0.1), ncol=len(current_formats) + 1, 
+                  frameon=True, fancybox=True, shadow=False, fontsize=13)
+        plt.tight_layout()
+        plt.subplots_adjust(bottom=0.2)  # Make room for the legend below
+
+        # --- Export ---
+        if output_filenames is not None:
+            output_filename = output_filenames[include_our_data]
+        else:
+            file_suffix = "_with_our" if include_our_data else "_without_our"
+            output_filename = f"graph_size_normalized_annotated{file_suffix}.pdf"
+        plt.savefig(output_filename)
+        print(f"Saved plot: {output_filename}")
+        plt.close(fig)
 
 # --- Main Execution ---
 if __name__ == "__main__":
-    datasets = sorted(list(SPACE_DATA.keys()))
-
-    print("--- Generating plot WITHOUT 'Our' data ---")
-    plot_normalized_with_annotation(SPACE_DATA, datasets, include_our_data=False)
-
-    print("\n--- Generating plot WITH 'Our' data ---")
-    plot_normalized_with_annotation(SPACE_DATA, datasets, include_our_data=True)
\ No newline at end of file
+    print("--- Generating plots WITHOUT and WITH 'Our' data ---")
+    plot_normalized_with_annotation(SPACE_DATA, DATASETS, variants=(False, True))
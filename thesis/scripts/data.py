@@ -3,6 +3,8 @@ Shared data used across multiple plotting scripts.
 Contains datasets for space usage, time measurements, and other experimental data.
 """
 
+import numpy as np
+
 # Space usage data (used in adj_space_plot.py and pareto_frontier.py)
 SPACE_DATA = {
     'prime': {
@@ -279,4 +281,39 @@ RELABEL_DATA = {
         'CM': 14362964,
         'DM': 16053916
     }
-}
\ No newline at end of file
+}
+
+# Dataset names in plotting order (alphabetical), shared by all per-dataset tables above
+DATASETS = tuple(sorted(SPACE_DATA))
+
+def to_matrix(table, columns, rows):
+    """
+    Convert a nested {row: {column: value}} table into a dense float64 array.
+
+    Args:
+        table (dict): One of the per-dataset tables above.
+        columns (sequence): Column keys (e.g. techniques), in output column order.
+        rows (sequence): Row keys (e.g. datasets), in output row order.
+
+    Returns:
+        np.ndarray: Array of shape (len(rows), len(columns)); missing entries are 0.
+    """
+    return np.array([[table[row].get(col, 0) for col in columns] for row in rows], dtype=np.float64)
+
+def normalize_rows(values, baseline):
+    """
+    Normalize each row of a matrix to its baseline with one reciprocal and a broadcast multiply.
+
+    Args:
+        values (np.ndarray): Array of shape (n_rows, n_columns).
+        baseline (np.ndarray): Baseline per row, of shape (n_rows, 1).
+
+    Returns:
+        np.ndarray: values / baseline; rows with a non-positive baseline are 0, and entries
+        equal to their baseline are exactly 1.0 (x * (1 / x) can be off by one ulp).
+    """
+    has_base = baseline > 0
+    inv_baseline = np.divide(1.0, baseline, out=np.zeros_like(baseline, dtype=np.float64), where=has_base)
+    normalized = values * inv_baseline
+    normalized[(values == baseline) & has_base] = 1.0
+    return normalized
\ No newline at end of file
@@ -1,12 +1,13 @@
+import matplotlib
+matplotlib.use('pdf') # Non-interactive backend: plots are only written to PDF files
 import matplotlib.pyplot as plt
 import numpy as np
-from config import setup_matplotlib_fonts, TECHNIQUE_COLORS, INPUT_FILE_STYLES, to_MB, format_annotation_with_ratio
-from data import GDB_SPACE_DATA
+from config import setup_matplotlib_fonts, TECHNIQUE_COLORS, INPUT_FILE_STYLES, ANNOTATE_BARS, to_MB, format_annotation_with_ratio
+from data import GDB_SPACE_DATA, to_matrix
 
 # Setup fonts
 setup_matplotlib_fonts()
 
-datasets = sorted(list(GDB_SPACE_DATA.keys()))
 formats = ['Our', 'Neo4j', 'ArangoDB'] # Database formats
 format_colors = {
     'Our': TECHNIQUE_COLORS['Our'],
@@ -14,67 +15,46 @@ format_colors = {
     'ArangoDB': TECHNIQUE_COLORS['ArangoDB']
 }
 
-def plot_storage_normalized(data, normalize_by='unzipped'):
+# format_annotation_with_ratio applied element-wise over (abs, norm) arrays
+_format_annotations = np.frompyfunc(format_annotation_with_ratio, 3, 1)
+
+def plot_storage_normalized(data, normalize_by='unzipped', annotate=ANNOTATE_BARS, output_path=None, datasets=None):
     assert normalize_by in ('zipped', 'unzipped'), "normalize_by must be 'zipped' or 'unzipped'"
 
+    # Plot the datasets of the given table, sorted by name unless an order is given
+    if datasets is None:
+        datasets = sorted(data)
+
     plot_elements = []
-    max_normalized_value = 0
 
-    # Prepare data for database formats
-    db_formats_prepared_data = []
-    for fmt in formats:
-        norm_vals = []
-        abs_vals_mb = []
-        for ds_name in datasets:
-            ds_data = data[ds_name]
-            val = ds_data[fmt]
-            base_val = ds_data[normalize_by]
-
-            if val == 0 or base_val == 0: # Handle zero values to avoid division by zero or meaningless ratios
-                norm_vals.append(np.nan)
-                abs_vals_mb.append(np.nan)
-            else:
-                norm_vals.append(val / base_val)
-                abs_vals_mb.append(to_MB(val))
-
-        db_formats_prepared_data.append({
-            'label': fmt,
-            'normalized_values': np.array(norm_vals),
-            'absolute_MB_values': np.array(abs_vals_mb),
-            'color': format_colors[fmt],
-            'hatch': None
-        })
-        if len(norm_vals) > 0:
-            current_max = np.nanmax(norm_vals) if not all(np.isnan(norm_vals)) else 0
-            if current_max > max_normalized_value:
-                max_normalized_value = current_max
+    # Sizes as (formats x datasets) and (datasets,) arrays, built once
+    format_sizes = to_matrix(data, formats, datasets).T
+    zipped_sizes, unzipped_sizes = to_matrix(data, ['zipped', 'unzipped'], datasets).T
+    base_sizes = zipped_sizes if normalize_by == 'zipped' else unzipped_sizes
+
+    # Zero values are left as NaN to avoid division by zero or meaningless ratios
+    valid = (format_sizes != 0) & (base_sizes != 0)
+    format_norm = np.divide(format_sizes, base_sizes, out=np.full_like(format_sizes, np.nan), where=valid)
+    format_abs_mb = np.where(valid, to_MB(format_sizes), np.nan)
 
+    # Prepare data for database formats
+    db_formats_prepared_data = [{
+        'label': fmt,
+        'normalized_values': format_norm[i],
+        'absolute_MB_values': format_abs_mb[i],
+        'color': format_colors[fmt],
+        'hatch': None
+    } for i, fmt in enumerate(formats)]
 
     if normalize_by == 'zipped':
         # Add "Uncompressed Input" as the first element to plot
-        uncomp_norm_vals = []
-        uncomp_abs_vals_mb = []
-        for ds_name in datasets:
-            ds_data = data[ds_name]
-            val = ds_data['unzipped']
-            base_val = ds_data['zipped']
-            if base_val == 0:
-                uncomp_norm_vals.append(np.nan)
-            else:
-                uncomp_norm_vals.append(val / base_val)
-            uncomp_abs_vals_mb.append(to_MB(val))
-
         plot_elements.append({
             'label': 'Uncompressed Input',
-            'normalized_values': np.array(uncomp_norm_vals),
-            'absolute_MB_values': np.array(uncomp_abs_vals_mb),
+            'normalized_values': np.divide(unzipped_sizes, base_sizes, out=np.full_like(base_sizes, np.nan),
+                                           where=base_sizes != 0),
+            'absolute_MB_values': to_MB(unzipped_sizes),
             **INPUT_FILE_STYLES['Uncompressed Input']
         })
-        if len(uncomp_norm_vals) > 0:
-            current_max = np.nanmax(uncomp_norm_vals) if not all(np.isnan(uncomp_norm_vals)) else 0
-            if current_max > max_normalized_value:
-                max_normalized_value = current_max
-
         plot_elements.extend(db_formats_prepared_data)
         plot_title = 'Graph DB Storage Normalized to Zipped Input Size'
         y_axis_label = 'Relative Size (Zipped Input = 1.0)'
@@ -82,34 +62,28 @@ def plot_storage_normalized(data, normalize_by='unzipped'):
 
     elif normalize_by == 'unzipped':
         # Add "Zipped Input" as the first element to plot
-        zip_norm_vals = []
-        zip_abs_vals_mb = []
-        for ds_name in datasets:
-            ds_data = data[ds_name]
-            val = ds_data['zipped']
-            base_val = ds_data['unzipped']
-            if base_val == 0:
-                zip_norm_vals.append(np.nan)
-            else:
-                zip_norm_vals.append(val / base_val)
-            zip_abs_vals_mb.append(to_MB(val))
-
         plot_elements.append({
             'label': 'Zipped Input',
-            'normalized_values': np.array(zip_norm_vals),
-            'absolute_MB_values': np.array(zip_abs_vals_mb),
+            'normalized_values': np.divide(zipped_sizes, base_sizes, out=np.full_like(base_sizes, np.nan),
+                                           where=base_sizes != 0),
+            'absolute_MB_values': to_MB(zipped_sizes),
             **INPUT_FILE_STYLES['Zipped Input']
         })
-        if len(zip_norm_vals) > 0:
-            current_max = np.nanmax(zip_norm_vals) if not all(np.isnan(zip_norm_vals)) else 0
-            if current_max > max_normalized_value:
-                max_normalized_value = current_max
-
         plot_elements.extend(db_formats_prepared_data)
         plot_title = 'Graph DB Storage Normalized to Original Dataset Size'
         y_axis_label = 'Relative Size (Original Dataset = 1.0)'
         baseline_label = 'Original Dataset (baseline)'
 
+    # One row per plot element; NaN entries (missing bars) are ignored, 0 if nothing can be plotted
+    norm_matrix = np.array([element['normalized_values'] for element in plot_elements])
+    max_normalized_value = 0 if np.isnan(norm_matrix).all() else np.nanmax(norm_matrix)
+
+    # Annotation text for every bar at once, skipping NaN and zero-height bars
+    if annotate:
+        abs_mb_matrix = np.array([element['absolute_MB_values'] for element in plot_elements])
+        labels_matrix = np.where(~np.isnan(abs_mb_matrix) & (norm_matrix > 0),
+                                 _format_annotations(abs_mb_matrix, norm_matrix, "MB"), '')
+
     # Plotting
     x = np.arange(len(datasets))
     n_bars_per_group = len(plot_elements)
@@ -131,23 +105,8 @@ def plot_storage_normalized(data, normalize_by='unzipped'):
         )
 
         # Annotate with MB sizes and normalization ratios
-        for bar_idx, bar in enumerate(bars):
-            abs_size = element['absolute_MB_values'][bar_idx]
-            norm_ratio = element['normalized_values'][bar_idx]
-            if not np.isnan(abs_size) and norm_ratio > 0:  # Only annotate non-zero values
-                height = bar.get_height()
-                if not np.isnan(height) and height > 0: # Only annotate if height is not NaN and > 0
-                    annotation_text = format_annotation_with_ratio(abs_size, norm_ratio, "MB")
-                    if annotation_text:  # Only add if annotation is not empty
-                        ax.text(
-                            bar.get_x() + bar.get_width() / 2,
-                            height + 0.05 * max_normalized_value, # Dynamic offset for text
-                            annotation_text,
-                            ha='center',
-                            va='bottom',
-                            fontsize=7, # Standardized font size
-                            rotation=90
-                        )
+        if annotate:
+            ax.bar_label(bars, labels=labels_matrix[i].tolist(), rotation=90, padding=3, fontsize=7)
 
     # Baseline at 1.0
     ax.axhline(y=1.0, color='dimgray', linestyle='--', linewidth=1.2, label=baseline_label)
@@ -169,8 +128,10 @@ def plot_storage_normalized(data, normalize_by='unzipped'):
     plt.subplots_adjust(bottom=0.2)  # Make room for the legend below
 
     suffix = normalize_by
-    plt.savefig(f"graphdb_storage_normalized_by_{suffix}.pdf", bbox_inches='tight')
-    plt.show()
+    if output_path is None:
+        output_path = f"graphdb_storage_normalized_by_{suffix}.pdf"
+    plt.savefig(output_path, bbox_inches='tight')
+    plt.close(fig)
 
 if __name__ == "__main__":
     plot_storage_normalized(GDB_SPACE_DATA, normalize_by='unzipped')
\ No newline at end of file
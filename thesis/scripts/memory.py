@@ -1,24 +1,65 @@
 import json
+import matplotlib
+matplotlib.use('pdf') # Non-interactive backend: plots are only written to PDF files
 import matplotlib.pyplot as plt
 import numpy as np
 import os
 import argparse
-from config import setup_matplotlib_fonts, TECHNIQUE_COLORS
+from config import setup_matplotlib_fonts, TECHNIQUE_COLORS, PDF_METADATA
+
+try:
+    import orjson  # Optional: faster parser for the whole file
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # Optional: streams the JSON file one dataset at a time
+except ImportError:
+    ijson = None
 
 # Setup fonts
 setup_matplotlib_fonts()
 
 def load_memory_stats(json_file):
-    """Load memory statistics from a JSON file."""
-    with open(json_file, 'r') as f:
-        return json.load(f)
+    """
+    Load memory statistics from a JSON file.
+
+    Only the 'detailed' component breakdown of each dataset is kept. The file is parsed with
+    orjson if it is installed; otherwise, if ijson is installed, it is parsed one dataset at a
+    time, so the other sections are never held in memory all together. Without either it falls
+    back to json.load.
 
-def group_components(detailed_data):
+    Args:
+        json_file (str): Path to a JSON file with datasets as top-level keys
+
+    Returns:
+        dict: {dataset: {'detailed': {component: size}}}; datasets without a breakdown map to {}
+    """
+    with open(json_file, 'rb') as f:
+        if orjson is not None:
+            datasets = orjson.loads(f.read()).items()
+        elif ijson is not None:
+            datasets = ijson.kvitems(f, '', use_float=True)
+        else:
+            datasets = json.load(f).items()
+        return {dataset: {'detailed': data['detailed']} if 'detailed' in data else {}
+                for dataset, data in datasets}
+
+# Raw components that have their own category in group_components; everything else is "Other"
+ACCOUNTED_COMPONENTS = frozenset({
+    'nodeAdjLists', 'edgeAdjLists', 'nodeParentLists',
+    'nodeIntLikeProperties', 'edgeIntLikeProperties', 
+    'nodeDoubleProperties', 'edgeDoubleProperties',
+    'varSize', 'typesSystemOverhead', 'labels', 'nodePkToId'
+})
+
+def group_components(detailed_data, debug=False):
     """
     Group raw component data into meaningful categories aligned with thesis terminology.
     
     Args:
         detailed_data (dict): Raw component data from JSON
+        debug (bool): Also store the raw components making up "Other" under '_other_details'
         
     Returns:
         dict: Grouped components with meaningful names
@@ -66,28 +107,76 @@ def group_components(detailed_data):
         grouped['Node ID Mapping'] = detailed_data['nodePkToId']
     
     # Other - Any remaining components
-    accounted_components = {
-        'nodeAdjLists', 'edgeAdjLists', 'nodeParentLists',
-        'nodeIntLikeProperties', 'edgeIntLikeProperties', 
-        'nodeDoubleProperties', 'edgeDoubleProperties',
-        'varSize', 'typesSystemOverhead', 'labels', 'nodePkToId'
-    }
-    
-    other_total = 0
-    other_components = []
-    for comp, size in detailed_data.items():
-        if comp not in accounted_components and size > 0:
-            other_total += size
-            other_components.append(f"{comp}({size//(1024*1024):.1f}MB)")
+    other_total = sum(size for comp, size in detailed_data.items()
+                      if comp not in ACCOUNTED_COMPONENTS and size > 0)
     
     if other_total > 0:
         grouped['Other'] = other_total
-        # Store component details for debugging
-        grouped['_other_details'] = other_components
+        if debug:
+            # Store component details for debugging
+            grouped['_other_details'] = [f"{comp}({size//(1024*1024):.1f}MB)" for comp, size in detailed_data.items()
+                                         if comp not in ACCOUNTED_COMPONENTS and size > 0]
     
     return grouped
 
-def plot_memory_breakdown_stacked(memory_data, output_dir):
+# Preferred order for components (thesis-aligned), as a component -> rank lookup
+PREFERRED_RANK = {component: rank for rank, component in enumerate([
+    'Adjacency Lists', 'Parent Lists', 'Fixed-size Properties', 
+    'Variable-size Properties', 'Type System', 'Node ID Mapping', 'Other'
+])}
+
+# Colors for components (darker colors for better white text contrast)
+COMPONENT_COLORS = {
+    'Adjacency Lists': '#1f77b4',           # Blue (dark enough for white text)
+    'Parent Lists': '#d62728',              # Red (dark enough for white text)  
+    'Fixed-size Properties': '#2ca02c',     # Green (dark enough for white text)
+    'Variable-size Properties': '#ff7f0e',  # Orange (dark enough for white text)
+    'Type System': '#9467bd',               # Purple (dark enough for white text)
+    'Node ID Mapping': '#8c564b',           # Brown (dark enough for white text)
+    'Other': '#7f7f7f'                      # Gray (dark enough for white text)
+}
+FALLBACK_COLORS = ['#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+
+def build_grouped(memory_data, debug=False):
+    """
+    Group the components of every dataset that has a detailed breakdown.
+    
+    Args:
+        memory_data (dict): Dictionary with datasets as keys, as returned by load_memory_stats
+        debug (bool): Passed on to group_components
+        
+    Returns:
+        dict: Grouped components per dataset, computed once and shared by the summary and the plot
+    """
+    return {dataset: group_components(data['detailed'], debug=debug)
+            for dataset, data in memory_data.items() if 'detailed' in data}
+
+def prepare_breakdown(memory_data, grouped_data=None):
+    """
+    Tabulate the grouped component sizes of every dataset with a detailed breakdown.
+    
+    Args:
+        memory_data (dict): Dictionary with datasets as keys, as returned by load_memory_stats
+        grouped_data (dict, optional): Output of build_grouped, computed here if not given
+        
+    Returns:
+        tuple: (datasets, components, sizes), where sizes is an int64 (datasets x components) matrix
+               with 0 for absent components; datasets keep the order of memory_data and components
+               are sorted by preferred order, then alphabetically
+    """
+    if grouped_data is None:
+        grouped_data = build_grouped(memory_data)
+    
+    datasets = list(grouped_data)
+    components = sorted({component for grouped in grouped_data.values() for component in grouped
+                         if component != '_other_details'},
+                        key=lambda x: (PREFERRED_RANK.get(x, len(PREFERRED_RANK)), x))
+    sizes = np.array([[grouped.get(component, 0) for component in components]
+                      for grouped in grouped_data.values()], dtype=np.int64).reshape(len(datasets), len(components))
+    return datasets, components, sizes
+
+def plot_memory_breakdown_stacked(memory_data, output_dir, breakdown=None,
+                                  output_filename='memory_breakdown_stacked.pdf'):
     """
     Create a stacked bar chart showing memory usage proportions by component for each dataset.
     Each bar represents 100% of memory usage, split proportionally by components.
@@ -95,103 +184,56 @@ def plot_memory_breakdown_stacked(memory_data, output_dir):
     Args:
         memory_data (dict): Dictionary with datasets as keys, each containing component sizes
         output_dir (str): Directory to save the plot
+        breakdown (tuple, optional): Output of prepare_breakdown, computed here if not given
+        output_filename (str): Name of the PDF written to output_dir
     """
-    datasets = sorted(list(memory_data.keys()))
-    
-    # Group components meaningfully and extract all unique categories
-    grouped_data = {}
-    all_components = set()
-    
-    for dataset, dataset_data in memory_data.items():
-        if 'detailed' in dataset_data:
-            grouped = group_components(dataset_data['detailed'])
-            # Remove debug info from plotting
-            if '_other_details' in grouped:
-                del grouped['_other_details']
-            grouped_data[dataset] = grouped
-            all_components.update(grouped.keys())
-    
-    # Define preferred order for components (thesis-aligned)
-    preferred_order = [
-        'Adjacency Lists', 'Parent Lists', 'Fixed-size Properties', 
-        'Variable-size Properties', 'Type System', 'Node ID Mapping', 'Other'
-    ]
-    
-    # Sort components according to preferred order, then alphabetically
-    all_components = sorted(list(all_components), 
-                           key=lambda x: (preferred_order.index(x) if x in preferred_order else len(preferred_order), x))
-    
-    # Define colors for components (darker colors for better white text contrast)
-    component_colors = {
-        'Adjacency Lists': '#1f77b4',           # Blue (dark enough for white text)
-        'Parent Lists': '#d62728',              # Red (dark enough for white text)  
-        'Fixed-size Properties': '#2ca02c',     # Green (dark enough for white text)
-        'Variable-size Properties': '#ff7f0e',  # Orange (dark enough for white text)
-        'Type System': '#9467bd',               # Purple (dark enough for white text)
-        'Node ID Mapping': '#8c564b',           # Brown (dark enough for white text)
-        'Other': '#7f7f7f'                      # Gray (dark enough for white text)
-    }
+    if breakdown is None:
+        breakdown = prepare_breakdown(memory_data)
+    datasets, all_components, sizes = breakdown
+    
+    # Bars are ordered by dataset name
+    order = sorted(range(len(datasets)), key=datasets.__getitem__)
+    datasets = [datasets[i] for i in order]
+    sizes = sizes[order]
     
     # Fallback colors for any unexpected components
-    fallback_colors = ['#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
-    fallback_idx = 0
-    for component in all_components:
-        if component not in component_colors:
-            component_colors[component] = fallback_colors[fallback_idx % len(fallback_colors)]
-            fallback_idx += 1
-    
-    # Calculate proportions for each dataset using grouped data
-    proportions_data = {}
-    for dataset in datasets:
-        if dataset not in grouped_data:
-            continue
-            
-        grouped = grouped_data[dataset]
-        total_size = sum(grouped.values())
-        
-        if total_size == 0:
-            continue
-            
-        proportions = {}
-        for component in all_components:
-            size = grouped.get(component, 0)
-            proportions[component] = (size / total_size) * 100  # Convert to percentage
-        
-        proportions_data[dataset] = proportions
+    unexpected_components = [component for component in all_components if component not in COMPONENT_COLORS]
+    component_colors = dict(COMPONENT_COLORS)
+    for fallback_idx, component in enumerate(unexpected_components):
+        component_colors[component] = FALLBACK_COLORS[fallback_idx % len(FALLBACK_COLORS)]
+    
+    # Percentages of each dataset's total
+    totals = sizes.sum(axis=1)
+    has_total = totals > 0
     
-    if not proportions_data:
+    if not has_total.any():
         print("No valid data found for plotting.")
         return
     
+    datasets_to_plot = [dataset for dataset, keep in zip(datasets, has_total) if keep]
+    proportions = sizes[has_total] / totals[has_total, None] * 100  # Convert to percentage
+    
+    # Each component is stacked on the sum of the components before it
+    bottoms = np.zeros_like(proportions)
+    bottoms[:, 1:] = np.cumsum(proportions, axis=1)[:, :-1]
+    
     # Create the stacked bar chart
     fig, ax = plt.subplots(figsize=(12, 8))
     
-    datasets_to_plot = sorted(list(proportions_data.keys()))
     x_pos = np.arange(len(datasets_to_plot))
     
     # Create stacked bars
-    bottom = np.zeros(len(datasets_to_plot))
-    
-    for component in all_components:
-        values = [proportions_data[dataset][component] for dataset in datasets_to_plot]
-        
-        # Only plot components that have non-zero values in at least one dataset
-        if max(values) > 0:
-            bars = ax.bar(x_pos, values, bottom=bottom, label=component, 
+    for j, component in enumerate(all_components):
+        # Only draw the visible (non-zero) segments, skipping components that are zero everywhere
+        visible = proportions[:, j] > 0
+        if visible.any():
+            values = proportions[visible, j]
+            bars = ax.bar(x_pos[visible], values, bottom=bottoms[visible, j], label=component, 
                          color=component_colors[component], edgecolor='white', linewidth=0.5)
             
             # Add percentage labels for components that take > 5% of space
-            for i, (bar, value) in enumerate(zip(bars, values)):
-                if value > 5:  # Only label if > 5%
-                    height = bar.get_height()
-                    ax.text(bar.get_x() + bar.get_width()/2., 
-                           bottom[i] + height/2.,
-                           f'{value:.1f}',
-                           ha='center', va='center',
-                           fontsize=11, fontweight='bold',
-                           color='white')
-            
-            bottom += values
+            ax.bar_label(bars, labels=[f'{value:.1f}' if value > 5 else '' for value in values],
+                         label_type='center', fontsize=11, fontweight='bold', color='white')
     
     # Customize the plot
     ax.set_xlabel('Dataset', fontsize=12)
@@ -209,43 +251,64 @@ def plot_memory_breakdown_stacked(memory_data, output_dir):
     ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.15), ncol=min(4, len(all_components)), 
               frameon=True, fancybox=True, shadow=False, fontsize=12, title="Memory Components")
     
-    plt.tight_layout()
-    plt.subplots_adjust(bottom=0.25)  # Make room for the legend below
+    fig.tight_layout()
+    fig.subplots_adjust(bottom=0.25)  # Make room for the legend below
     
     # Save the plot
-    output_file = os.path.join(output_dir, 'memory_breakdown_stacked.pdf')
-    plt.savefig(output_file, bbox_inches='tight', dpi=300)
+    output_file = os.path.join(output_dir, output_filename)
+    fig.savefig(output_file, bbox_inches='tight', dpi=300, metadata=PDF_METADATA)
     print(f"Saved stacked memory breakdown plot: {output_file}")
-    plt.show()
+    plt.close(fig)
 
-def print_memory_summary(memory_data):
-    """Print a summary of memory usage for each dataset."""
+def _sorted_by_size(sizes):
+    """
+    Sort a {component: size} dict by decreasing size with one NumPy pass.
+    
+    Returns:
+        tuple: (component names, np.ndarray of sizes, total size); equal sizes keep their dict order
+    """
+    names = list(sizes)
+    values = np.fromiter(sizes.values(), dtype=np.int64, count=len(names))
+    order = np.argsort(-values, kind='stable')
+    return [names[i] for i in order], values[order], int(values.sum())
+
+def print_memory_summary(memory_data, grouped_data=None, breakdown=None):
+    """
+    Print a summary of memory usage for each dataset.
+    
+    Args:
+        memory_data (dict): Dictionary with datasets as keys, as returned by load_memory_stats
+        grouped_data (dict, optional): Output of build_grouped(memory_data, debug=True), computed here if not given
+        breakdown (tuple, optional): Output of prepare_breakdown, computed here if not given
+    """
+    if grouped_data is None:
+        grouped_data = build_grouped(memory_data, debug=True)
+    if breakdown is None:
+        breakdown = prepare_breakdown(memory_data, grouped_data)
+    datasets, components, sizes = breakdown
+    
     print("\n" + "="*80)
     print("MEMORY USAGE SUMMARY (Grouped by Thesis Categories)")
     print("="*80)
     
-    for dataset, data in memory_data.items():
-        if 'detailed' not in data:
-            continue
-            
-        # Group components meaningfully
-        grouped = group_components(data['detailed'])
-        other_details = grouped.pop('_other_details', [])
+    for dataset, dataset_sizes in zip(datasets, sizes):
+        # Present components by decreasing size, equal sizes keep the preferred order
+        present = np.flatnonzero(dataset_sizes)
+        order = present[np.argsort(-dataset_sizes[present], kind='stable')]
+        other_details = grouped_data[dataset].get('_other_details', [])
         
-        total_size = sum(grouped.values())
+        total_size = int(dataset_sizes.sum())
         total_mb = total_size / (1024 * 1024)
         
         print(f"\nDataset: {dataset}")
         print(f"Total Memory: {total_mb:.2f} MB ({total_size:,} bytes)")
         print("-" * 50)
         
-        # Sort components by size (descending)
-        sorted_components = sorted(grouped.items(), key=lambda x: x[1], reverse=True)
-        
-        for component, size in sorted_components:
+        for j in order:
+            size = dataset_sizes[j]
             size_mb = size / (1024 * 1024)
             percentage = (size / total_size) * 100
-            print(f"  {component:<25}: {size_mb:>8.2f} MB ({percentage:>5.1f}%)")
+            print(f"  {components[j]:<25}: {size_mb:>8.2f} MB ({percentage:>5.1f}%)")
         
         # Show details for "Other" category if present
         if other_details:
@@ -253,11 +316,10 @@ def print_memory_summary(memory_data):
             
         print(f"\nRaw component breakdown for {dataset}:")
         print("-" * 30)
-        detailed = data['detailed']
-        raw_sorted = sorted(detailed.items(), key=lambda x: x[1], reverse=True)
-        for component, size in raw_sorted:
+        raw_components, raw_sizes, raw_total = _sorted_by_size(memory_data[dataset]['detailed'])
+        for component, size in zip(raw_components, raw_sizes):
             size_mb = size / (1024 * 1024)
-            percentage = (size / sum(detailed.values())) * 100
+            percentage = (size / raw_total) * 100
             print(f"  {component:<25}: {size_mb:>6.2f} MB ({percentage:>4.1f}%)")
 
 def main():
@@ -273,11 +335,15 @@ def main():
     # Load statistics
     memory_data = load_memory_stats(args.json_file)
     
+    # Group and tabulate components once for both the summary and the plot
+    grouped_data = build_grouped(memory_data, debug=True)
+    breakdown = prepare_breakdown(memory_data, grouped_data)
+    
     # Print summary
-    print_memory_summary(memory_data)
+    print_memory_summary(memory_data, grouped_data, breakdown)
     
     # Generate stacked bar chart
-    plot_memory_breakdown_stacked(memory_data, args.output)
+    plot_memory_breakdown_stacked(memory_data, args.output, breakdown)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
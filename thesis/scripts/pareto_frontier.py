@@ -2,7 +2,7 @@ import os
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.lines import Line2D
-from config import setup_matplotlib_fonts, TECHNIQUE_COLORS, OUR_DATA_KEY, CSR_BASELINE_KEY, LOGGRAPH_KEY, CGRAPHINDEX_KEY, to_MB
+from config import setup_matplotlib_fonts, TECHNIQUE_COLORS, OUR_DATA_KEY, CSR_BASELINE_KEY, LOGGRAPH_KEY, CGRAPHINDEX_KEY, PDF_METADATA, to_MB
 from data import SPACE_DATA, TIME_NEIGHBORS_SINGLE_HOP, TIME_NEIGHBORS_TWO_HOP
 
 # Setup fonts
@@ -12,58 +12,83 @@ def pareto_frontier(points):
     """
     Computes the Pareto frontier for a set of points.
     A point is on the Pareto frontier if it is not dominated by any other point.
+    
+    Args:
+        points (sequence): (x, y) pairs, both to be minimized
+        
+    Returns:
+        np.ndarray: Frontier points of shape (n, 2), sorted by increasing x
     """
-    sorted_points = sorted(points, key=lambda p: (p[0], p[1]))
-    pareto_front = []
-    min_y = float('inf')
-    for x, y in sorted_points:
-        if y < min_y:
-            pareto_front.append((x, y))
-            min_y = y
-    return pareto_front
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    order = np.lexsort((pts[:, 1], pts[:, 0]))  # By x, then y
+    xs, ys = pts[order, 0], pts[order, 1]
+    
+    # Keep a point only if its y is strictly below the y of every point sorted before it
+    prev_min = np.concatenate(([np.inf], np.minimum.accumulate(ys)[:-1]))
+    keep = ys < prev_min
+    return np.stack([xs[keep], ys[keep]], axis=1)
 
 def plot_pareto_for_datasets(space_data, time_data_map, base_path="plots/pareto"):
     """
     Generates and saves Pareto frontier plots for each dataset and query type.
     """
-    representations = [CSR_BASELINE_KEY, LOGGRAPH_KEY, CGRAPHINDEX_KEY, OUR_DATA_KEY]
-    colors = {
-        CSR_BASELINE_KEY: TECHNIQUE_COLORS['CSR'],
-        LOGGRAPH_KEY: TECHNIQUE_COLORS['LogGraph'],
-        CGRAPHINDEX_KEY: TECHNIQUE_COLORS['CGraphIndex'],
-        OUR_DATA_KEY: TECHNIQUE_COLORS['Our']
-    }
-    markers = {
-        CSR_BASELINE_KEY: 'o', LOGGRAPH_KEY: 's', CGRAPHINDEX_KEY: '^', OUR_DATA_KEY: 'D'
-    }
+    # (representation, color, marker) for every plotted representation
+    reps_meta = [
+        (CSR_BASELINE_KEY, TECHNIQUE_COLORS['CSR'], 'o'),
+        (LOGGRAPH_KEY, TECHNIQUE_COLORS['LogGraph'], 's'),
+        (CGRAPHINDEX_KEY, TECHNIQUE_COLORS['CGraphIndex'], '^'),
+        (OUR_DATA_KEY, TECHNIQUE_COLORS['Our'], 'D')
+    ]
+    
+    # The legend is the same for every plot
+    legend_elements = [
+        Line2D([0], [0], marker=marker, color=color, label=rep,
+               linestyle='None', markersize=10) for rep, color, marker in reps_meta
+    ]
+    
+    # Space values in MB are the same for every query type, so convert them once
+    space_mb_cache = {dataset: {rep: to_MB(size) for rep, size in reps.items()}
+                      for dataset, reps in space_data.items()}
+    
+    # One figure is reused for all plots and cleared between them
+    fig, ax = plt.subplots(figsize=(8, 6))
 
     for query_type, time_data in time_data_map.items():
         output_dir = f"{base_path}/{query_type}"
         os.makedirs(output_dir, exist_ok=True)
         
         for dataset in space_data.keys():
-            fig, ax = plt.subplots(figsize=(8, 6))
+            ax.clear()
             
             points_for_pareto = []
+            # (xs, ys, colors) per marker shape, so each shape is drawn by a single scatter call
+            points_by_marker = {}
+            
+            dataset_space_mb = space_mb_cache.get(dataset, {})
+            dataset_time = time_data.get(dataset, {})
+            
+            for rep, color, marker in reps_meta:
+                space_mb = dataset_space_mb.get(rep)
+                time_ns = dataset_time.get(rep)
+                if space_mb is None or time_ns is None:
+                    continue
+                
+                points_for_pareto.append((space_mb, time_ns))
+                
+                xs, ys, point_colors = points_by_marker.setdefault(marker, ([], [], []))
+                xs.append(space_mb)
+                ys.append(time_ns)
+                point_colors.append(color)
             
-            for rep in representations:
-                if dataset in space_data and rep in space_data[dataset] and \
-                   dataset in time_data and rep in time_data[dataset]:
-                    
-                    space_mb = to_MB(space_data[dataset][rep])
-                    time_ns = time_data[dataset][rep]
-                    
-                    points_for_pareto.append((space_mb, time_ns))
-                    
-                    ax.plot(space_mb, time_ns, marker=markers[rep], color=colors[rep], 
-                            linestyle='None', markersize=10, label=rep)
+            # s=100 and linewidths=1 match the former markersize=10 markers, zorder keeps them above the frontier
+            for marker, (xs, ys, point_colors) in points_by_marker.items():
+                ax.scatter(xs, ys, c=point_colors, marker=marker, s=100, linewidths=1.0, zorder=2)
 
             # Calculate and plot Pareto frontier
             if len(points_for_pareto) > 1:
                 frontier = pareto_frontier(points_for_pareto)
                 if len(frontier) > 1:
-                    frontier.sort()
-                    x_pareto, y_pareto = zip(*frontier)
+                    x_pareto, y_pareto = frontier.T
                     ax.plot(x_pareto, y_pareto, color='black', linestyle='-', marker='', zorder=1)
 
             # Format query type for better display
@@ -77,22 +102,18 @@ def plot_pareto_for_datasets(space_data, time_data_map, base_path="plots/pareto"
             ax.set_ylabel('Time per Query (ns)')
             ax.grid(True, which='both', linestyle='--', linewidth=0.5)
             
-            # Create legend
-            legend_elements = [
-                Line2D([0], [0], marker=markers[rep], color=colors[rep], label=rep,
-                       linestyle='None', markersize=10) for rep in representations
-            ]
             # Place legend outside and below the graph, expanding horizontally
             ax.legend(handles=legend_elements, loc='upper center', bbox_to_anchor=(0.5, -0.1), 
-                      ncol=len(representations), frameon=True, fancybox=True, shadow=False, 
+                      ncol=len(reps_meta), frameon=True, fancybox=True, shadow=False, 
                       fontsize=13, title="Representations")
 
-            plt.tight_layout()
-            plt.subplots_adjust(bottom=0.2)  # Make room for the legend below
+            fig.tight_layout()
+            fig.subplots_adjust(bottom=0.2)  # Make room for the legend below
             plot_filename = f"{output_dir}/{dataset}.pdf"
-            plt.savefig(plot_filename, bbox_inches='tight')
+            fig.savefig(plot_filename, bbox_inches='tight', metadata=PDF_METADATA)
             print(f"Saved plot: {plot_filename}")
-            plt.close(fig)
+    
+    plt.close(fig)
 
 if __name__ == "__main__":
     time_data_map = {
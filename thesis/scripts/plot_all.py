@@ -6,6 +6,7 @@ This script creates a /plots directory and generates all visualizations.
 
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 # Add the scripts directory to Python path for imports
@@ -19,13 +20,13 @@ from pareto_frontier import plot_pareto_for_datasets
 from gdb_space_comparison import plot_storage_normalized
 from gdb_time_comparison import plot_comparison, plot_properties_comparison, plot_combined_gdb_neighbors_comparison
 from relabelling import plot_data_normalized_with_annotation
-from config import setup_matplotlib_fonts
+from config import setup_matplotlib_fonts, TECHNIQUE_COLORS
 from data import (
     SPACE_DATA, TIME_NEIGHBORS_SINGLE_HOP, TIME_NEIGHBORS_TWO_HOP,
     GDB_SPACE_DATA,
     GDB_TIME_NEIGHBORS_SINGLE, GDB_TIME_NEIGHBORS_TWO,
     GDB_TIME_FIXEDSIZE_PROPS, GDB_TIME_VARSIZE_PROPS,
-    RELABEL_DATA
+    RELABEL_DATA, DATASETS
 )
 
 def create_plots_directory():
@@ -34,8 +35,34 @@ def create_plots_directory():
     plots_dir.mkdir(exist_ok=True)
     return plots_dir
 
-def generate_all_plots():
-    """Generate all required plots and save them to the plots directory."""
+def plot_memory_breakdown(output_path):
+    """Plot the memory breakdown from memory-breakdown.json, if the file is present."""
+    memory_json_path = script_dir / "memory-breakdown.json"
+    if memory_json_path.exists():
+        from memory import load_memory_stats, plot_memory_breakdown_stacked
+        memory_data = load_memory_stats(str(memory_json_path))
+        plot_memory_breakdown_stacked(memory_data, str(output_path.parent),
+                                      output_filename=output_path.name)
+
+def plot_relabelling(output_path):
+    """Plot the relabelling techniques comparison normalized by the CSV size."""
+    datasets_order = sorted(RELABEL_DATA)
+    items_order = ['CSV', 'random', 'topsort', 'BFS', 'CM', 'DM']
+    item_colors_map = {item: TECHNIQUE_COLORS[item] for item in items_order}
+    plot_data_normalized_with_annotation(RELABEL_DATA, datasets_order, items_order, 
+                                       item_colors_map, 'CSV', 
+                                       "Relabelling Techniques Comparison", 
+                                       "CSV", output_path=output_path)
+
+def generate_all_plots(max_workers=None):
+    """
+    Generate all required plots and save them to the plots directory.
+    
+    The plots are independent of each other, so they are rendered concurrently in a process pool.
+    
+    Args:
+        max_workers (int, optional): Number of worker processes, defaults to os.cpu_count()
+    """
     
     # Setup matplotlib fonts globally
     setup_matplotlib_fonts()
@@ -43,95 +70,51 @@ def generate_all_plots():
     # Create plots directory
     plots_dir = create_plots_directory()
     
-    # Change to plots directory for saving files
-    original_cwd = os.getcwd()
-    os.chdir(plots_dir)
+    time_data_map = {
+        'neighbors': TIME_NEIGHBORS_SINGLE_HOP,
+        '2neighbors': TIME_NEIGHBORS_TWO_HOP
+    }
+    
+    # (description, function, args, kwargs) for every plot, each one written straight to plots_dir
+    plot_jobs = [
+        ("📊 Adjacency space plots", plot_normalized_with_annotation, (SPACE_DATA, DATASETS),
+         {'variants': (False, True),
+          'output_filenames': {False: plots_dir / "adj_size_preliminary.pdf",
+                               True: plots_dir / "adj_size_comparison.pdf"}}),
+        ("🧠 Memory breakdown plot", plot_memory_breakdown,
+         (plots_dir / "graph_db_memory_breakdown.pdf",), {}),
+        ("⏱️  Single-hop adjacency time plot", plot_time_comparison_normalized,
+         (TIME_NEIGHBORS_SINGLE_HOP, "Single-hop Neighbor Query Performance",
+          str(plots_dir / "adj_neighbors_comparison")), {}),
+        ("⏱️  Two-hop adjacency time plot", plot_time_comparison_normalized,
+         (TIME_NEIGHBORS_TWO_HOP, "Two-hop Neighbor Query Performance",
+          str(plots_dir / "adj_2neighbors_comparison")), {}),
+        ("⏱️  Combined adjacency time plot", plot_combined_neighbors_comparison,
+         (TIME_NEIGHBORS_SINGLE_HOP, TIME_NEIGHBORS_TWO_HOP, "Combined Neighbor Query Performance",
+          str(plots_dir / "adj_combined_neighbors_comparison")), {}),
+        ("📈 Pareto curves", plot_pareto_for_datasets, (SPACE_DATA, time_data_map, str(plots_dir)), {}),
+        ("💾 Graph database size comparison", plot_storage_normalized, (GDB_SPACE_DATA,),
+         {'normalize_by': 'unzipped', 'output_path': plots_dir / "graphdb_size_comparison.pdf"}),
+        # Combined plot (replaces individual single/two-hop plots)
+        ("🏃 Graph database time plots", plot_combined_gdb_neighbors_comparison,
+         (GDB_TIME_NEIGHBORS_SINGLE, GDB_TIME_NEIGHBORS_TWO, "Graph Database Neighbor Query Performance",
+          str(plots_dir / "graphdb_neighbors_comparison")), {}),
+        ("🔧 Graph database properties comparison", plot_properties_comparison,
+         (GDB_TIME_FIXEDSIZE_PROPS, GDB_TIME_VARSIZE_PROPS, "Graph Database Properties Query Performance",
+          str(plots_dir / "graphdb_properties_comparison")), {}),
+        ("🏷️  Relabelling comparison", plot_relabelling, (plots_dir / "relabelling.pdf",), {}),
+    ]
     
     try:
         print("🎨 Generating all plots...")
         
-        # 1. Adjacency list space comparisons
-        print("📊 Generating adjacency space plots...")
-        datasets = sorted(list(SPACE_DATA.keys()))  # Alphabetical order
-        plot_normalized_with_annotation(SPACE_DATA, datasets, include_our_data=False)
-        # Rename the generated file to match expected name
-        if os.path.exists("graph_size_normalized_annotated_without_our.pdf"):
-            os.rename("graph_size_normalized_annotated_without_our.pdf", "adj_size_preliminary.pdf")
-        
-        plot_normalized_with_annotation(SPACE_DATA, datasets, include_our_data=True)
-        # Rename the generated file to match expected name
-        if os.path.exists("graph_size_normalized_annotated_with_our.pdf"):
-            os.rename("graph_size_normalized_annotated_with_our.pdf", "adj_size_comparison.pdf")
-        
-        # 2. Memory breakdown
-        print("🧠 Generating memory breakdown plot...")
-        # Load memory data and generate plot
-        import json
-        memory_json_path = script_dir / "memory-breakdown.json"
-        if memory_json_path.exists():
-            from memory import load_memory_stats, plot_memory_breakdown_stacked
-            memory_data = load_memory_stats(str(memory_json_path))
-            plot_memory_breakdown_stacked(memory_data, ".")
-            # Rename to expected filename
-            if os.path.exists("memory_breakdown_stacked.pdf"):
-                os.rename("memory_breakdown_stacked.pdf", "graph_db_memory_breakdown.pdf")
-        
-        # 3. Adjacency list time comparisons
-        print("⏱️  Generating adjacency time plots...")
-        # Generate individual plots
-        plot_time_comparison_normalized(TIME_NEIGHBORS_SINGLE_HOP, 
-                                      "Single-hop Neighbor Query Performance", 
-                                      "adj_neighbors_comparison")
-        plot_time_comparison_normalized(TIME_NEIGHBORS_TWO_HOP, 
-                                      "Two-hop Neighbor Query Performance", 
-                                      "adj_2neighbors_comparison")
-        
-        # Generate combined plot
-        plot_combined_neighbors_comparison(TIME_NEIGHBORS_SINGLE_HOP, TIME_NEIGHBORS_TWO_HOP,
-                                         "Combined Neighbor Query Performance", 
-                                         "adj_combined_neighbors_comparison")
-        
-        # 4. Pareto curves for each dataset
-        print("📈 Generating Pareto curves...")
-        time_data_map = {
-            'neighbors': TIME_NEIGHBORS_SINGLE_HOP,
-            '2neighbors': TIME_NEIGHBORS_TWO_HOP
-        }
-        plot_pareto_for_datasets(SPACE_DATA, time_data_map, ".")
-        
-        # 5. Graph database size comparison
-        print("💾 Generating graph database size comparison...")
-        plot_storage_normalized(GDB_SPACE_DATA, normalize_by='unzipped')
-        # Rename to expected filename
-        if os.path.exists("graphdb_storage_normalized_by_unzipped.pdf"):
-            os.rename("graphdb_storage_normalized_by_unzipped.pdf", "graphdb_size_comparison.pdf")
-        
-        # 6. Graph database time comparisons
-        print("🏃 Generating graph database time plots...")
-        # Generate combined plot (replaces individual single/two-hop plots)
-        plot_combined_gdb_neighbors_comparison(GDB_TIME_NEIGHBORS_SINGLE, GDB_TIME_NEIGHBORS_TWO,
-                                             "Graph Database Neighbor Query Performance", 
-                                             "graphdb_neighbors_comparison")
-        
-        # 7. Graph database properties comparison (split chart)
-        print("🔧 Generating graph database properties comparison...")
-        plot_properties_comparison(GDB_TIME_FIXEDSIZE_PROPS, GDB_TIME_VARSIZE_PROPS, 
-                                 "Graph Database Properties Query Performance", 
-                                 "graphdb_properties_comparison")
-        
-        # 8. Relabelling comparison
-        print("🏷️  Generating relabelling comparison...")
-        from config import TECHNIQUE_COLORS
-        datasets_order = sorted(list(RELABEL_DATA.keys()))
-        items_order = ['CSV', 'random', 'topsort', 'BFS', 'CM', 'DM']
-        item_colors_map = {item: TECHNIQUE_COLORS[item] for item in items_order}
-        plot_data_normalized_with_annotation(RELABEL_DATA, datasets_order, items_order, 
-                                           item_colors_map, 'CSV', 
-                                           "Relabelling Techniques Comparison", 
-                                           "CSV")
-        # Rename to expected filename
-        if os.path.exists("relabelled_graph_size_normalized_annotated.pdf"):
-            os.rename("relabelled_graph_size_normalized_annotated.pdf", "relabelling.pdf")
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            futures = {executor.submit(function, *args, **kwargs): description
+                       for description, function, args, kwargs in plot_jobs}
+            for future in as_completed(futures):
+                # Re-raises any exception from the worker process
+                future.result()
+                print(f"{futures[future]} done")
         
         print("✅ All plots generated successfully!")
         print(f"📁 Plots saved to: {plots_dir.absolute()}")
@@ -148,9 +131,6 @@ def generate_all_plots():
     except Exception as e:
         print(f"❌ Error generating plots: {e}")
         raise
-    finally:
-        # Return to original directory
-        os.chdir(original_cwd)
 
 def verify_all_expected_plots():
     """Verify that all expected plots were generated."""
@@ -169,15 +149,13 @@ def verify_all_expected_plots():
     ]
     
     # Add Pareto curve files for each dataset
-    datasets = sorted(list(TIME_NEIGHBORS_SINGLE_HOP.keys()))
-    for dataset in datasets:
+    for dataset in DATASETS:
         expected_files.append(f"neighbors/{dataset}.pdf")
         expected_files.append(f"2neighbors/{dataset}.pdf")
     
-    missing_files = []
-    for expected_file in expected_files:
-        if not (plots_dir / expected_file).exists():
-            missing_files.append(expected_file)
+    # One directory walk instead of a stat call per expected file
+    existing_files = {path.relative_to(plots_dir).as_posix() for path in plots_dir.rglob("*.pdf")}
+    missing_files = [expected_file for expected_file in expected_files if expected_file not in existing_files]
     
     if missing_files:
         print(f"\n⚠️  Missing expected files:")
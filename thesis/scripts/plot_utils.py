@@ -0,0 +1,53 @@
+"""
+Shared drawing helpers for the grouped bar plots.
+Contains the bar layout and annotation code reused by the plotting scripts.
+"""
+
+import matplotlib.colors as mcolors
+import matplotlib.patches as patches
+import numpy as np
+from config import format_annotation_with_ratio
+
+def ratio_label(norm_val):
+    """Ratio annotation for a bar, empty for values that would show as 0.0x."""
+    if norm_val <= 0.01:
+        return ''
+    annotation_text = format_annotation_with_ratio(0, norm_val, "")
+    return annotation_text if annotation_text != "0.0x" else ''
+
+def draw_grouped_bars(ax, values, group_labels, series_labels, series_colors, labels=None,
+                      fontsize=8, group_width=0.8):
+    """
+    Draw a grouped bar chart with a single ax.bar call and label the x axis with the groups.
+
+    Args:
+        ax: The matplotlib Axes to draw on.
+        values (np.ndarray): Bar heights of shape (n_groups, n_series), e.g. datasets x techniques.
+        group_labels (sequence): One x tick label per group (row).
+        series_labels (sequence): One legend label per series (column).
+        series_colors (sequence): One color per series (column).
+        labels (array-like, optional): Annotation text per bar, same shape as values ('' for none).
+        fontsize (int): Font size of the bar annotations.
+        group_width (float): Total width allocated for all bars of a single group.
+
+    Returns:
+        list: One legend handle (Patch) per series.
+    """
+    n_groups, n_series = values.shape
+    width = group_width / n_series
+    x = np.arange(n_groups)
+
+    # Center the bars of each group around its x position
+    offsets = (np.arange(n_series) - (n_series - 1) / 2) * width
+    positions = x[:, None] + offsets[None, :]
+    # Colors are parsed once into an (n_series, 4) RGBA array and tiled per group
+    series_rgba = mcolors.to_rgba_array(series_colors)
+    bars = ax.bar(positions.ravel(), values.ravel(), width, color=np.tile(series_rgba, (n_groups, 1)))
+
+    if labels is not None:
+        ax.bar_label(bars, labels=np.ravel(labels).tolist(), rotation=90, padding=3, fontsize=fontsize)
+
+    ax.set_xticks(x)
+    ax.set_xticklabels(group_labels)
+
+    return [patches.Patch(facecolor=color, label=label) for label, color in zip(series_labels, series_rgba)]
@@ -1,10 +1,12 @@
+import functools
+from types import MappingProxyType
+import matplotlib
+matplotlib.use('pdf') # Non-interactive backend: plots are only written to PDF files
 import matplotlib.pyplot as plt
 import numpy as np
 from config import setup_matplotlib_fonts, TECHNIQUE_COLORS, to_MB, format_annotation_with_ratio
-from data import RELABEL_DATA
-
-# Setup fonts
-setup_matplotlib_fonts()
+from data import RELABEL_DATA, to_matrix
+from plot_utils import draw_grouped_bars
 
 # --- Constants for Plot Configuration ---
 # Master list of all techniques in their desired default order for plotting
@@ -37,61 +39,76 @@ CHOSEN_TECHNIQUES_TO_PLOT = ['CSV', 'topsort', 'CM', 'BFS', 'random', 'DM']
 # CHOSEN_TECHNIQUES_TO_PLOT = ['random', 'BFS'] # Example where baseline might not be initially chosen by user
 # --- End User Configuration ---
 
-# Determine the actual techniques to plot based on user's choice
-if CHOSEN_TECHNIQUES_TO_PLOT is None:
-    # Plot all techniques from the master list
-    techniques_for_plot_final = MASTER_TECHNIQUES_ORDER[:]
-else:
-    # Start with user's chosen techniques, ensuring they are valid (exist in MASTER_TECHNIQUES_ORDER)
-    selected_techniques_set = {tech for tech in CHOSEN_TECHNIQUES_TO_PLOT if tech in MASTER_TECHNIQUES_ORDER}
-
-    # Ensure the baseline technique is always included
-    selected_techniques_set.add(BASELINE_TECHNIQUE_NAME)
-
-    # Order the final list of techniques according to MASTER_TECHNIQUES_ORDER
-    techniques_for_plot_final = [tech for tech in MASTER_TECHNIQUES_ORDER if tech in selected_techniques_set]
-
-# Filter the color map to include only the selected techniques
-active_technique_colors_final = {
-    tech: ALL_TECHNIQUE_COLORS[tech]
-    for tech in techniques_for_plot_final
-    if tech in ALL_TECHNIQUE_COLORS
-}
+@functools.lru_cache(maxsize=None)
+def _resolve_techniques(chosen_techniques):
+    """
+    Determine the actual techniques to plot, and their colors, based on user's choice.
+
+    Args:
+        chosen_techniques (tuple or None): Selected technique names, None for all of MASTER_TECHNIQUES_ORDER
+
+    Returns:
+        tuple: (techniques in MASTER_TECHNIQUES_ORDER order, read-only {technique: color} mapping)
+    """
+    if chosen_techniques is None:
+        # Plot all techniques from the master list
+        techniques = tuple(MASTER_TECHNIQUES_ORDER)
+    else:
+        # Start with user's chosen techniques, ensuring they are valid (exist in MASTER_TECHNIQUES_ORDER)
+        selected_techniques_set = {tech for tech in chosen_techniques if tech in MASTER_TECHNIQUES_ORDER}
+
+        # Ensure the baseline technique is always included
+        selected_techniques_set.add(BASELINE_TECHNIQUE_NAME)
+
+        # Order the final list of techniques according to MASTER_TECHNIQUES_ORDER
+        techniques = tuple(tech for tech in MASTER_TECHNIQUES_ORDER if tech in selected_techniques_set)
+
+    # Filter the color map to include only the selected techniques
+    colors = MappingProxyType({
+        tech: ALL_TECHNIQUE_COLORS[tech]
+        for tech in techniques
+        if tech in ALL_TECHNIQUE_COLORS
+    })
+    return techniques, colors
+
+techniques_for_plot_final, active_technique_colors_final = _resolve_techniques(
+    None if CHOSEN_TECHNIQUES_TO_PLOT is None else tuple(CHOSEN_TECHNIQUES_TO_PLOT))
 
 # Datasets to plot (derived from data keys, can be made configurable if needed)
-datasets_to_plot = sorted(list(RELABEL_DATA.keys()))
+datasets_to_plot = sorted(RELABEL_DATA)
+
+# format_annotation_with_ratio applied element-wise over (size, ratio) arrays
+_format_annotations = np.frompyfunc(format_annotation_with_ratio, 3, 1)
 
 # Modified plotting function (the function itself doesn't need changes for this feature)
 def plot_data_normalized_with_annotation(data_dict, datasets_order, items_order, item_colors_map,
-                                         baseline_item_name, plot_title, y_label_base):
-    normalized_values = []
-    absolute_sizes_MB = []
+                                         baseline_item_name, plot_title, y_label_base,
+                                         output_path="relabelled_graph_size_normalized_annotated.pdf"):
+    # Setup fonts on first use, so importing the constants above does not configure matplotlib
+    setup_matplotlib_fonts()
 
+    # Validate every dataset up front with one set difference each
+    required_items = set(items_order)
     for ds_name in datasets_order:
-        if baseline_item_name not in data_dict[ds_name]:
+        available_items = data_dict[ds_name].keys()
+        if baseline_item_name not in available_items:
             raise ValueError(f"Baseline item '{baseline_item_name}' not found in dataset '{ds_name}'.")
 
-        baseline_val = data_dict[ds_name][baseline_item_name]
-        if baseline_val == 0:
+        if data_dict[ds_name][baseline_item_name] == 0:
             print(f"Warning: Baseline value for '{baseline_item_name}' in dataset '{ds_name}' is 0. Normalization will result in NaNs or Infs.")
-            # Assign NaN to prevent division by zero errors and allow plotting of other data
-            baseline_val = np.nan
-
-        current_ds_item_sizes_bytes = []
-        for item_name in items_order:
-            if item_name not in data_dict[ds_name]:
-                raise ValueError(f"Item '{item_name}' not found in dataset '{ds_name}'. Ensure all datasets have all items for selected techniques.")
-            current_ds_item_sizes_bytes.append(data_dict[ds_name][item_name])
 
-        # Handle potential division by zero/NaN gracefully if baseline_val is NaN
-        with np.errstate(divide='ignore', invalid='ignore'):
-            normalized_values.append([s / baseline_val for s in current_ds_item_sizes_bytes])
-        absolute_sizes_MB.append([to_MB(s) for s in current_ds_item_sizes_bytes])
+        missing_items = required_items - available_items
+        if missing_items:
+            missing_list = ', '.join(f"'{item}'" for item in items_order if item in missing_items)
+            raise ValueError(f"Item(s) {missing_list} not found in dataset '{ds_name}'. Ensure all datasets have all items for selected techniques.")
 
-    normalized_np = np.array(normalized_values)
-    abs_MB_np = np.array(absolute_sizes_MB)
-
-    x_positions = np.arange(len(datasets_order))
+    # Sizes as (datasets x items) and baselines as (datasets x 1) arrays, normalized with one broadcast division
+    sizes = to_matrix(data_dict, items_order, datasets_order)
+    baseline = to_matrix(data_dict, [baseline_item_name], datasets_order)
+    # A zero baseline becomes NaN to prevent division by zero errors and allow plotting of other data
+    has_baseline = baseline[:, 0] != 0
+    normalized_np = sizes / np.where(has_baseline[:, None], baseline, np.nan)
+    abs_MB_np = to_MB(sizes)
 
     num_items_per_group = len(items_order)
     if num_items_per_group == 0:
@@ -99,60 +116,43 @@ def plot_data_normalized_with_annotation(data_dict, datasets_order, items_order,
         return
 
     group_total_width_on_axis = 0.8
-    individual_bar_width = group_total_width_on_axis / num_items_per_group
+
+    # Annotation text for every bar: both absolute size and normalization ratio.
+    # NaN ratios only come from zero baselines, so those whole datasets are left unlabelled with one row mask
+    annotation_labels = np.full(normalized_np.shape, '', dtype=object)
+    annotation_labels[has_baseline] = _format_annotations(abs_MB_np[has_baseline], normalized_np[has_baseline], "MB")
 
     fig, ax = plt.subplots(figsize=(14, 7.5))
 
-    for i, item_name in enumerate(items_order):
-        bar_center_offsets = (i - (num_items_per_group - 1) / 2.0) * individual_bar_width
-        current_item_bar_positions = x_positions + bar_center_offsets
-
-        bars = ax.bar(current_item_bar_positions, normalized_np[:, i],
-                      width=individual_bar_width, label=item_name, color=item_colors_map.get(item_name, '#808080')) # Default to gray if color missing
-
-        for bar, size_mb in zip(bars, abs_MB_np[:, i]):
-            height = bar.get_height()
-            if np.isnan(height): continue
-            # Show both absolute size and normalization ratio
-            annotation_text = format_annotation_with_ratio(size_mb, height, "MB")
-            
-            ax.text(
-                bar.get_x() + bar.get_width() / 2,
-                height + 0.03,
-                annotation_text,
-                ha='center',
-                va='bottom',
-                fontsize=7,
-                rotation=90
-            )
-
-    ax.axhline(y=1.0, color='gray', linestyle='--', linewidth=1.2, label=f'{baseline_item_name} baseline (1.0)')
+    # All bars in a single ax.bar call, colored per item and labelled by the same helper
+    item_colors = [item_colors_map.get(item_name, '#808080') for item_name in items_order] # Default to gray if color missing
+    legend_handles = draw_grouped_bars(ax, normalized_np, datasets_order, items_order, item_colors,
+                                       labels=annotation_labels, fontsize=7,
+                                       group_width=group_total_width_on_axis)
+
+    baseline_line = ax.axhline(y=1.0, color='gray', linestyle='--', linewidth=1.2, label=f'{baseline_item_name} baseline (1.0)')
     ax.set_xlabel('Dataset', fontsize=12)
     ax.set_ylabel(f'Relative Size ({y_label_base} = 1.0)', fontsize=12)
     ax.set_title(plot_title, fontsize=14, pad=20 + (num_items_per_group > 3) * 20 )
 
-    ax.set_xticks(x_positions)
-    ax.set_xticklabels(datasets_order, fontsize=10)
-    ax.tick_params(axis='y', labelsize=10)
+    ax.tick_params(labelsize=10)
 
-    max_normalized_val = 0
-    # Calculate max ignoring NaNs
-    if normalized_np[~np.isnan(normalized_np)].size > 0 :
-        max_normalized_val = np.max(normalized_np[~np.isnan(normalized_np)])
+    # Calculate max ignoring NaNs (0 if every value is NaN)
+    max_normalized_val = 0 if np.isnan(normalized_np).all() else np.nanmax(normalized_np)
 
     effective_max_y_for_ylim = max_normalized_val + 0.15
     y_upper_limit = max(1.25, effective_max_y_for_ylim * 1.2)
     ax.set_ylim(0, y_upper_limit)
 
     # Place legend outside and below the graph, expanding horizontally
-    ax.legend(loc='upper center', bbox_to_anchor=(0.5, -0.1), 
+    ax.legend(handles=[baseline_line] + legend_handles, loc='upper center', bbox_to_anchor=(0.5, -0.1), 
               ncol=min(6, num_items_per_group), frameon=True, fancybox=True, shadow=False, fontsize=13)
 
-    plt.tight_layout()
-    plt.subplots_adjust(bottom=0.2)  # Make room for the legend below
+    fig.tight_layout()
+    fig.subplots_adjust(bottom=0.2)  # Make room for the legend below
 
-    plt.savefig("relabelled_graph_size_normalized_annotated.pdf", bbox_inches='tight')
-    plt.show()
+    fig.savefig(output_path, bbox_inches='tight')
+    plt.close(fig)
 
 if __name__ == "__main__":
     plot_title = f'Storage Size of Relabelling Techniques Relative to "{BASELINE_TECHNIQUE_NAME.capitalize()}"'